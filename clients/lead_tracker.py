@@ -1,8 +1,8 @@
 import os
 import logging
-from typing import List, Dict, Optional
 import gspread
 from google.oauth2.service_account import Credentials
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +30,10 @@ class LeadTrackerClient:
         try:
             creds = Credentials.from_service_account_file(creds_path, scopes=self.SCOPES)
             self.gc = gspread.authorize(creds)
+            # Widen the connection pool so parallel calls reuse connections
+            # (gspread 6 keeps the session on http_client, older versions on the client)
+            session = getattr(self.gc, "http_client", self.gc).session
+            session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
             
             sheet_id = os.getenv("SPREADSHEET_ID")
             if not sheet_id:
@@ -46,6 +50,9 @@ class LeadTrackerClient:
         #Fetch all leads from sheet.
         try:
             records = self.sheet.get_all_records()
+            # Normalize ids to str once here so callers can compare and key on them directly
+            for record in records:
+                record["id"] = str(record.get("id"))
             logger.info(f"Retrieved {len(records)} leads from Google Sheets")
             return records
         except gspread.exceptions.APIError as e:
@@ -54,10 +61,11 @@ class LeadTrackerClient:
     
     def get_lead_by_id(self, lead_id):
         #Find a specific lead by ID.
+        lead_id = str(lead_id)
         try:
             records = self.get_all_leads()
             for record in records:
-                if str(record.get("id")) == str(lead_id):
+                if record["id"] == lead_id:
                     return record
             
             logger.warning(f"Lead with id {lead_id} not found")
@@ -95,34 +103,62 @@ class LeadTrackerClient:
             logger.error(f"Error creating lead: {str(e)}")
             raise
     
-    def update_lead(self, lead_id, updates):
+    @staticmethod
+    def row_index(records):
+        #Map lead id -> sheet row number for rows returned by get_all_leads.
+        return {record["id"]: idx + 2 for idx, record in enumerate(records)}  # header is row 1
+
+    def update_lead(self, lead_id, updates, row_num=None):
+        #Update fields of a lead; pass row_num (from row_index) to skip re-reading the sheet.
+        lead_id = str(lead_id)
         try:
-            records = self.get_all_leads()
-            
-            for idx, record in enumerate(records):
-                if str(record.get("id")) == str(lead_id):
-                    row_num = idx + 2  # Header is row 1, data starts at row 2
-                    
-                    for field, value in updates.items():
-                        if field in self.HEADERS:
-                            col_num = self.HEADERS.index(field) + 1
-                            self.sheet.update_cell(row_num, col_num, value)
-                            logger.info(f"Updated lead {lead_id}: {field} = {value}")
-                    
-                    return True
-            
-            logger.warning(f"Lead {lead_id} not found for update")
-            return False
+            if row_num is None:
+                row_num = self.row_index(self.get_all_leads()).get(lead_id)
+            if row_num is None:
+                logger.warning(f"Lead {lead_id} not found for update")
+                return False
+
+            for field, value in updates.items():
+                if field in self.HEADERS:
+                    col_num = self.HEADERS.index(field) + 1
+                    self.sheet.update_cell(row_num, col_num, value)
+                    logger.info(f"Updated lead {lead_id}: {field} = {value}")
+
+            return True
             
         except Exception as e:
             logger.error(f"Error updating lead {lead_id}: {str(e)}")
             raise
+    def update_leads(self, updates, row_nums):
+        #Write fields for many leads in one batched request; row_nums comes from row_index.
+        data = []
+        for lead_id, fields in updates.items():
+            row_num = row_nums.get(lead_id)
+            if row_num is None:
+                logger.warning(f"Lead {lead_id} not found for update")
+                continue
+            for field, value in fields.items():
+                if field in self.HEADERS:
+                    col_num = self.HEADERS.index(field) + 1
+                    data.append(
+                        {"range": gspread.utils.rowcol_to_a1(row_num, col_num), "values": [[value]]}
+                    )
+        if not data:
+            return
+        try:
+            self.sheet.batch_update(data)
+            logger.info(f"Updated {len(updates)} leads in one batch")
+        except Exception as e:
+            logger.error(f"Error batch updating leads: {str(e)}")
+            raise
+
     def delete_lead(self, lead_id: str) -> bool:
     #Delete the row for a given lead_id from the sheet.
+        lead_id = str(lead_id)
         try:
             records = self.get_all_leads()
             for idx, record in enumerate(records):
-                if str(record.get("id")) == str(lead_id):
+                if record["id"] == lead_id:
                     row_num = idx + 2  # header is row 1
                     self.sheet.delete_rows(row_num)
                     logger.info(f"Deleted lead {lead_id} from Google Sheets")
@@ -133,3 +169,38 @@ class LeadTrackerClient:
             logger.error(f"Error deleting lead {lead_id}: {e}")
             return False
 
+    def delete_leads(self, lead_ids):
+        #Delete the rows for several lead_ids in one batched request; returns the ids deleted.
+        wanted = {str(lead_id) for lead_id in lead_ids}
+        try:
+            records = self.get_all_leads()
+            matches = [
+                (idx + 2, record["id"])  # header is row 1
+                for idx, record in enumerate(records)
+                if record["id"] in wanted
+            ]
+            if not matches:
+                logger.warning(f"Leads {sorted(wanted)} not found for deletion")
+                return set()
+
+            # Delete bottom-up so earlier deletions do not shift later rows
+            requests = [
+                {
+                    "deleteDimension": {
+                        "range": {
+                            "sheetId": self.sheet.id,
+                            "dimension": "ROWS",
+                            "startIndex": row_num - 1,
+                            "endIndex": row_num,
+                        }
+                    }
+                }
+                for row_num, _ in sorted(matches, reverse=True)
+            ]
+            self.sheet.spreadsheet.batch_update({"requests": requests})
+            deleted = {lead_id for _, lead_id in matches}
+            logger.info(f"Deleted {len(deleted)} leads from Google Sheets")
+            return deleted
+        except Exception as e:
+            logger.error(f"Error deleting leads {sorted(wanted)}: {e}")
+            return set()
@@ -1,8 +1,10 @@
 import os
 import logging
 import re
-from typing import List, Dict, Optional
+from typing import Optional
 
+import requests
+from requests.adapters import HTTPAdapter
 from trello import TrelloClient
 from trello.exceptions import ResourceUnavailable
 
@@ -35,8 +37,10 @@ class WorkTrackerClient:
             raise ValueError("Missing Trello credentials")
 
         try:
-            # Initialize Trello client
-            self.client = TrelloClient(api_key=api_key, token=token)
+            # Initialize Trello client on a pooled session so parallel calls reuse connections
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+            self.client = TrelloClient(api_key=api_key, token=token, http_service=session)
             self.board = self.client.get_board(board_id)
             # Cache lists by name
             self.lists = {l.name: l for l in self.board.list_lists()}
@@ -1,38 +1,105 @@
+import atexit
 import logging
+import logging.handlers
 import os
-import sys
-import io
+import queue
+import time
 from datetime import datetime
 
+# Daily log file, resolved once per process
+LOG_DIR = "logs"
+LOG_FILE = os.path.join(LOG_DIR, f"sync_{datetime.now().strftime('%Y%m%d')}.log")
+
+# One queue and background file listener per process, plus one console handler,
+# shared by all loggers
+_log_queue = None
+_listener = None
+_console_handler = None
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_DATEFMT = "%Y-%m-%d %H:%M:%S"
+
+
+class CachedTimeFormatter(logging.Formatter):
+    # Formatter that renders %(asctime)s once per second instead of once per record
+
+    def __init__(self, fmt=None, datefmt=None):
+        super().__init__(fmt, datefmt)
+        self._last_sec = None
+        self._last_str = None
+
+    def formatTime(self, record, datefmt=None):
+        sec = int(record.created)
+        if sec != self._last_sec:
+            self._last_str = time.strftime(
+                datefmt or self.default_time_format, self.converter(sec)
+            )
+            self._last_sec = sec
+        return self._last_str
+
+
+class BufferedFileHandler(logging.FileHandler):
+    # File handler with a 64 KiB write buffer that only flushes every FLUSH_EVERY records
+    # (errors are flushed right away so they are never lost in the buffer)
+
+    BUFFER_SIZE = 65536
+    FLUSH_EVERY = 1000
+
+    def __init__(self, filename, encoding=None):
+        self._pending = 0
+        self._force_flush = False
+        super().__init__(filename, encoding=encoding)
+
+    def _open(self):
+        return open(
+            self.baseFilename, self.mode, buffering=self.BUFFER_SIZE, encoding=self.encoding
+        )
+
+    def emit(self, record):
+        self._pending += 1
+        self._force_flush = record.levelno >= logging.ERROR
+        super().emit(record)
+
+    def flush(self):
+        # Called by StreamHandler.emit after every record; only hit the disk in batches
+        if self._pending >= self.FLUSH_EVERY or self._force_flush:
+            self._pending = 0
+            self._force_flush = False
+            super().flush()
+
+
 def setup_logger(name):
     #Configure logging with file and console handlers
+    global _log_queue, _listener, _console_handler
     logger = logging.getLogger(name)
     logger.setLevel(logging.DEBUG)
-    
-    # Create logs directory
-    log_dir = "logs"
-    os.makedirs(log_dir, exist_ok=True)
-    
-    # File handler (daily log file)
-    log_file = os.path.join(log_dir, f"sync_{datetime.now().strftime('%Y%m%d')}.log")
-    fh = logging.FileHandler(log_file, encoding='utf-8')
-    fh.setLevel(logging.DEBUG)
-    
-    # Console handler
-    ch = logging.StreamHandler()
-    ch.setLevel(logging.INFO)
-    
-    # Formatter
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
-    fh.setFormatter(formatter)
-    ch.setFormatter(formatter)
-    
+
+    if _listener is None:
+        # Create logs directory
+        os.makedirs(LOG_DIR, exist_ok=True)
+
+        # File handler (daily log file)
+        fh = BufferedFileHandler(LOG_FILE, encoding='utf-8')
+        fh.setLevel(logging.DEBUG)
+
+        # Console handler stays synchronous so output keeps its order relative to the
+        # CLI menu and prompts
+        _console_handler = logging.StreamHandler()
+        _console_handler.setLevel(logging.INFO)
+
+        # Formatter (one per handler: the time cache is not shared across threads)
+        fh.setFormatter(CachedTimeFormatter(LOG_FORMAT, datefmt=LOG_DATEFMT))
+        _console_handler.setFormatter(CachedTimeFormatter(LOG_FORMAT, datefmt=LOG_DATEFMT))
+
+        # File writes run on a background thread; callers only enqueue records
+        _log_queue = queue.Queue(-1)
+        _listener = logging.handlers.QueueListener(_log_queue, fh, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
     # Add handlers (avoid duplicates)
     if not logger.handlers:
-        logger.addHandler(fh)
-        logger.addHandler(ch)
-    
+        logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+        logger.addHandler(_console_handler)
+
     return logger
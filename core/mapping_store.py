@@ -0,0 +1,176 @@
+import json
+import os
+import logging
+from typing import Dict
+from datetime import datetime
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _dumps(obj) -> bytes:
+    # Compact JSON encoding, via orjson when available
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+class MappingStore:
+    # Lead <-> card mapping kept in memory, backed by a JSON snapshot plus an append-only journal
+
+    OP_ADD = "add"
+    OP_DEL = "del"
+    # Record a status both sides of a pair were just synced to
+    OP_STATUS = "status"
+
+    def __init__(self, snapshot_file):
+        self.snapshot_file = snapshot_file
+        self.journal_file = os.path.splitext(snapshot_file)[0] + ".log"
+        self._journal = None
+        self.mapping = self._load_mapping()
+
+    @staticmethod
+    def _default_mapping() -> Dict:
+        return {
+            "lead_to_card": {},
+            "card_to_lead": {},
+            # Last status seen per lead id and card id, written by full_sync
+            "status_snapshot": {},
+            "last_sync": None,
+            "sync_count": 0,
+        }
+
+    def _load_mapping(self) -> Dict:
+        # Read the snapshot if present, then replay journal entries written since
+        data = self._default_mapping()
+        if os.path.exists(self.snapshot_file):
+            try:
+                with open(self.snapshot_file, "rb") as f:
+                    if ijson is not None:
+                        self._stream_snapshot(f, data)
+                    else:
+                        data.update(_loads(f.read()))
+            except Exception as e:
+                logger.error(f"Failed to load mapping file: {e}")
+                # Never start from a half-loaded snapshot
+                data = self._default_mapping()
+
+        replayed = self._replay(data)
+        logger.info(
+            f"Loaded mapping file with {len(data['lead_to_card'])} mappings "
+            f"({replayed} journal entries replayed)"
+        )
+        return data
+
+    @staticmethod
+    def _stream_snapshot(f, data):
+        # One incremental pass over the top-level keys, so at most one section is
+        # materialized at a time; keys absent from the file keep their defaults
+        for key, value in ijson.kvitems(f, ""):
+            data[key] = value
+
+    def _replay(self, data) -> int:
+        # Apply journal records on top of the snapshot; a torn last line is ignored
+        if not os.path.exists(self.journal_file):
+            return 0
+        count = 0
+        try:
+            with open(self.journal_file, "rb") as f:
+                for line in f:
+                    try:
+                        record = _loads(line)
+                    except ValueError:
+                        logger.warning("Skipping unreadable mapping journal entry")
+                        continue
+                    self._apply(data, record["op"], record["l"], record["c"], record.get("s"))
+                    count += 1
+        except Exception as e:
+            logger.error(f"Failed to replay mapping journal: {e}")
+        return count
+
+    @classmethod
+    def _apply(cls, data, op, lead_id, card_id, status=None):
+        if op == cls.OP_ADD:
+            data["lead_to_card"][lead_id] = card_id
+            data["card_to_lead"][card_id] = lead_id
+        elif op == cls.OP_DEL:
+            data["lead_to_card"].pop(lead_id, None)
+            data["card_to_lead"].pop(card_id, None)
+            data["status_snapshot"].pop(lead_id, None)
+            data["status_snapshot"].pop(card_id, None)
+        elif op == cls.OP_STATUS:
+            data["status_snapshot"][lead_id] = status
+            data["status_snapshot"][card_id] = status
+
+    def append(self, op, lead_id, card_id):
+        # Update the in-memory dicts and record the change with a single journal write
+        self.append_many(op, [(lead_id, card_id)])
+
+    def append_many(self, op, entries):
+        # Apply a batch of (lead_id, card_id[, status]) changes and journal them in one write
+        lines = []
+        for lead_id, card_id, *rest in entries:
+            lead_id = str(lead_id)
+            record = {"op": op, "l": lead_id, "c": card_id}
+            if rest:
+                record["s"] = rest[0]
+            self._apply(self.mapping, op, lead_id, card_id, *rest)
+            lines.append(_dumps(record))
+        if not lines:
+            return
+        if self._journal is None:
+            os.makedirs(os.path.dirname(self.journal_file) or ".", exist_ok=True)
+            self._journal = open(self.journal_file, "ab")
+            # Terminate a record torn by a previous crash so it cannot swallow ours
+            if self._journal.tell() and not self._ends_with_newline():
+                self._journal.write(b"\n")
+        self._journal.write(b"\n".join(lines) + b"\n")
+        self._journal.flush()
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.journal_file, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def snapshot(self):
+        # Rewrite the compacted snapshot atomically and truncate the journal
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_file) or ".", exist_ok=True)
+            self.mapping["last_sync"] = datetime.now().isoformat()
+            self.mapping["sync_count"] = self.mapping.get("sync_count", 0) + 1
+            tmp_file = self.snapshot_file + ".tmp"
+            # Write a sibling temp file and rename it over the snapshot, so a crash
+            # mid-write leaves the previous snapshot intact
+            with open(tmp_file, "wb") as f:
+                f.write(_dumps(self.mapping))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.snapshot_file)
+
+            # Journal entries are now covered by the snapshot
+            self.close()
+            open(self.journal_file, "wb").close()
+            logger.info(f"Saved mapping file (sync #{self.mapping['sync_count']})")
+        except Exception as e:
+            logger.error(f"Failed to save mapping file: {e}")
+            raise
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
@@ -1,69 +1,73 @@
-import json
 import os
 import logging
 from typing import Dict
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from clients.lead_tracker import LeadTrackerClient
 from clients.work_tracker import WorkTrackerClient
+from core.mapping_store import MappingStore
 
 logger = logging.getLogger(__name__)
 
 
 class SyncEngine:
+    # Card text for newly created follow-up cards
+    CARD_TITLE = "Follow-up: %s"
+    CARD_DESCRIPTION = "Email: %s\nSource: %s"
+
     def __init__(self):
         # Initialize clients and load mapping file
         self.lead_client = LeadTrackerClient()
         self.work_client = WorkTrackerClient()
+        # Shared pool for fanning out independent API calls
+        self.pool = ThreadPoolExecutor(max_workers=16)
         self.mapping_file = os.getenv("MAPPING_FILE", "data/mapping.json")
-        self.mapping = self._load_mapping()
+        self.store = MappingStore(self.mapping_file)
+        self.mapping = self.store.mapping
+        # Lead id -> sheet row for the current public call, built from rows already
+        # fetched so lead updates skip a full sheet read each
+        self._lead_rows: Dict[str, int] = {}
 
-    def _load_mapping(self) -> Dict:
-        # Load mapping.json if present, else create default structure
-        if os.path.exists(self.mapping_file):
-            try:
-                with open(self.mapping_file, "r") as f:
-                    data = json.load(f)
-                    logger.info(
-                        f"Loaded mapping file with {len(data.get('lead_to_card', {}))} mappings"
-                    )
-                    return data
-            except Exception as e:
-                logger.error(f"Failed to load mapping file: {e}")
+    def _save_mapping(self):
+        # Compact the journal into a fresh mapping.json snapshot
+        self.store.snapshot()
 
-        return {
-            "lead_to_card": {},
-            "card_to_lead": {},
-            "last_sync": None,
-            "sync_count": 0,
-        }
+    def _index_rows(self, leads):
+        self._lead_rows = self.lead_client.row_index(leads)
 
-    def _save_mapping(self):
-        # Persist mapping.json and update metadata
-        try:
-            os.makedirs(os.path.dirname(self.mapping_file), exist_ok=True)
-            self.mapping["last_sync"] = datetime.now().isoformat()
-            self.mapping["sync_count"] = self.mapping.get("sync_count", 0) + 1
-            with open(self.mapping_file, "w") as f:
-                json.dump(self.mapping, f, indent=2)
-            logger.info(f"Saved mapping file (sync #{self.mapping['sync_count']})")
-        except Exception as e:
-            logger.error(f"Failed to save mapping file: {e}")
-            raise
+    def _create_one(self, lead):
+        # Worker: create the card for one lead; sheet writes stay on the main thread
+        name, email, source = lead.get("name"), lead.get("email"), lead.get("source", "")
+        return self.work_client.create_card(
+            title=self.CARD_TITLE % (name,),
+            lead_id=lead["id"],
+            description=self.CARD_DESCRIPTION % (email, source),
+        )
 
     def initial_sync(self):
         # Create cards for all eligible leads that do not yet have cards
+        leads = self.lead_client.get_all_leads()
+        self._index_rows(leads)
+        try:
+            self._initial_sync(leads)
+        finally:
+            self._lead_rows.clear()
+
+    def _initial_sync(self, leads):
+        # Create missing cards for already-fetched leads; returns how many cards were made
         logger.info("=" * 50)
         logger.info("STARTING INITIAL SYNC (Leads -> Cards)")
         logger.info("=" * 50)
 
         try:
-            leads = self.lead_client.get_all_leads()
-            created_count = 0
+            created = {}
+            write_back = {}
             skipped_count = 0
+            eligible = []
+            lead_to_card = self.mapping["lead_to_card"]
 
             for lead in leads:
-                lead_id = str(lead.get("id"))
+                lead_id = lead["id"]
                 status = lead.get("status")
 
                 # Skip LOST leads
@@ -71,38 +75,56 @@ class SyncEngine:
                     skipped_count += 1
                     continue
 
-                # Skip if mapping already exists
-                if lead_id in self.mapping["lead_to_card"]:
+                # Skip if mapping already exists, but backfill a card id the sheet is missing
+                card_id = lead_to_card.get(lead_id)
+                if card_id is not None:
+                    if str(lead.get("trello_card_id") or "") != card_id:
+                        write_back[lead_id] = card_id
                     skipped_count += 1
                     continue
 
-                try:
-                    card_id = self.work_client.create_card(
-                        title=f"Follow-up: {lead.get('name')}",
-                        lead_id=lead_id,
-                        description=f"Email: {lead.get('email')}\nSource: {lead.get('source', '')}",
-                    )
+                eligible.append(lead)
 
-                    # Store bidirectional mapping
-                    self.mapping["lead_to_card"][lead_id] = card_id
-                    self.mapping["card_to_lead"][card_id] = lead_id
-
-                    # Persist card id in sheet
-                    self.lead_client.update_lead(lead_id, {"trello_card_id": card_id})
-
-                    created_count += 1
-                    logger.info(f"Created card for lead {lead_id}")
+            # Create cards concurrently; mapping is only touched from this thread
+            futures = {
+                self.pool.submit(self._create_one, lead): lead["id"]
+                for lead in eligible
+            }
+            for future in as_completed(futures):
+                lead_id = futures[future]
+                try:
+                    card_id = future.result()
                 except Exception as e:
                     logger.error(f"Failed to create card for lead {lead_id}: {e}")
+                    continue
 
-            self._save_mapping()
-            logger.info(f"Initial sync complete: {created_count} created, {skipped_count} skipped")
+                # Store bidirectional mapping
+                self.store.append(MappingStore.OP_ADD, lead_id, card_id)
+                created[lead_id] = card_id
+                write_back[lead_id] = card_id
+                logger.info(f"Created card for lead {lead_id}")
+
+            # Persist card ids in sheet with one batched write; ids that fail to land
+            # are retried by the backfill above on the next run
+            if write_back:
+                updates = {
+                    lead_id: {"trello_card_id": card_id}
+                    for lead_id, card_id in write_back.items()
+                }
+                try:
+                    self.lead_client.update_leads(updates, self._lead_rows)
+                except Exception as e:
+                    logger.error(f"Failed to store card ids for {len(updates)} leads in sheet: {e}")
+
+            logger.info(f"Initial sync complete: {len(created)} created, {skipped_count} skipped")
+            return len(created)
         except Exception as e:
             logger.error(f"Initial sync failed: {e}")
             raise
 
     def sync_lead_to_task(self, lead_id):
         # Sync a single lead's status to its Trello card, or archive card if lead vanished
+        lead_id = str(lead_id)
         logger.info(f"Syncing lead {lead_id} -> task")
         try:
             lead = self.lead_client.get_lead_by_id(lead_id)
@@ -110,36 +132,61 @@ class SyncEngine:
             # If lead is gone but mapping exists, archive the card
             if not lead:
                 logger.warning(f"Lead {lead_id} not found in Sheet")
-                card_id = self.mapping["lead_to_card"].get(str(lead_id))
+                card_id = self.mapping["lead_to_card"].get(lead_id)
                 if card_id:
                     if self.work_client.archive_card(card_id):
                         logger.info(
                             f"Archived card {card_id} because lead {lead_id} no longer exists"
                         )
-                        self.mapping["lead_to_card"].pop(str(lead_id), None)
-                        self.mapping["card_to_lead"].pop(card_id, None)
-                        self._save_mapping()
+                        self.store.append(MappingStore.OP_DEL, lead_id, card_id)
                     return True
                 return False
 
             # Normal path: lead exists
-            card_id = self.mapping["lead_to_card"].get(str(lead_id))
+            return self._sync_lead_obj(lead)
+        except Exception as e:
+            logger.error(f"Error syncing lead {lead_id}: {e}")
+            return False
+
+    def _record_statuses(self, entries):
+        # Journal (lead_id, card_id, status) for pairs synced outside full_sync, so the
+        # next full_sync diffs against what both sides now hold; unchanged pairs are skipped
+        snapshot = self.mapping["status_snapshot"]
+        changed = [
+            (lead_id, card_id, status)
+            for lead_id, card_id, status in entries
+            if snapshot.get(lead_id) != status or snapshot.get(card_id) != status
+        ]
+        self.store.append_many(MappingStore.OP_STATUS, changed)
+
+    def _sync_lead_obj(self, lead, repairs=None, statuses=None):
+        # Push an already-fetched lead's status to its card; when repairs/statuses lists
+        # are given, mapping repairs and synced statuses are collected there instead of journaled
+        lead_id = lead["id"]
+        try:
+            card_id = self.mapping["lead_to_card"].get(lead_id)
 
             # Fallback: use trello_card_id from sheet to repair mapping
-            if not card_id:
+            if card_id is None:
                 sheet_card_id = lead.get("trello_card_id")
                 if sheet_card_id:
                     card_id = sheet_card_id
-                    self.mapping["lead_to_card"][str(lead_id)] = card_id
-                    self.mapping["card_to_lead"][card_id] = str(lead_id)
-                    self._save_mapping()
+                    if repairs is None:
+                        self.store.append(MappingStore.OP_ADD, lead_id, card_id)
+                    else:
+                        repairs.append((lead_id, card_id))
                     logger.info(f"Repaired mapping for lead {lead_id}")
                 else:
                     logger.warning(f"No mapped card for lead {lead_id}")
                     return False
 
             status = lead.get("status")
-            self.work_client.update_card_status(card_id, status)
+            if not self.work_client.update_card_status(card_id, status):
+                return False
+            if statuses is None:
+                self._record_statuses([(lead_id, card_id, status)])
+            else:
+                statuses.append((lead_id, card_id, status))
             return True
         except Exception as e:
             logger.error(f"Error syncing lead {lead_id}: {e}")
@@ -160,20 +207,34 @@ class SyncEngine:
                         logger.info(
                             f"Deleted lead {lead_id} because card {card_id} no longer exists"
                         )
-                        self.mapping["card_to_lead"].pop(card_id, None)
-                        self.mapping["lead_to_card"].pop(str(lead_id), None)
-                        self._save_mapping()
+                        self.store.append(MappingStore.OP_DEL, lead_id, card_id)
                     return True
                 return False
 
             # Normal path: card exists
+            return self._sync_card_obj(card)
+        except Exception as e:
+            logger.error(f"Error syncing card {card_id}: {e}")
+            return False
+
+    def _sync_card_obj(self, card, statuses=None):
+        # Push an already-fetched card's status to its mapped lead
+        card_id = card.get("id")
+        try:
             lead_id = self.mapping["card_to_lead"].get(card_id)
             if not lead_id:
                 logger.warning(f"No mapped lead for card {card_id}")
                 return False
 
             status = card.get("status")
-            self.lead_client.update_lead(lead_id, {"status": status})
+            if not self.lead_client.update_lead(
+                lead_id, {"status": status}, self._lead_rows.get(lead_id)
+            ):
+                return False
+            if statuses is None:
+                self._record_statuses([(lead_id, card_id, status)])
+            else:
+                statuses.append((lead_id, card_id, status))
             return True
         except Exception as e:
             logger.error(f"Error syncing card {card_id}: {e}")
@@ -184,79 +245,179 @@ class SyncEngine:
         logger.info("Running bulk leads -> tasks status sync...")
         leads = self.lead_client.get_all_leads()
         success_count = 0
-        for lead in leads:
-            lead_id = str(lead.get("id"))
-            if self.sync_lead_to_task(lead_id):
-                success_count += 1
-        logger.info(f"Completed leads -> tasks sync: {success_count}/{len(leads)} successful")
+        repairs = []
+        statuses = []
+        try:
+            for lead in leads:
+                if self._sync_lead_obj(lead, repairs, statuses):
+                    success_count += 1
+            logger.info(f"Completed leads -> tasks sync: {success_count}/{len(leads)} successful")
+        finally:
+            # Persist repairs and synced statuses once per bulk run, even if interrupted
+            if repairs:
+                self.store.append_many(MappingStore.OP_ADD, repairs)
+            self._record_statuses(statuses)
 
     def sync_all_tasks_to_leads(self):
         # Bulk sync of all tasks -> leads
         logger.info("Running bulk tasks -> leads status sync...")
         cards = self.work_client.get_all_cards()
+        # One sheet read up front instead of one per lead update
+        self._index_rows(self.lead_client.get_all_leads())
         success_count = 0
-        for card in cards:
-            card_id = card.get("id")
-            if self.sync_task_to_lead(card_id):
-                success_count += 1
-        logger.info(f"Completed tasks -> leads sync: {success_count}/{len(cards)} successful")
+        statuses = []
+        try:
+            for card in cards:
+                if self._sync_card_obj(card, statuses):
+                    success_count += 1
+            logger.info(f"Completed tasks -> leads sync: {success_count}/{len(cards)} successful")
+        finally:
+            self._record_statuses(statuses)
+            self._lead_rows.clear()
 
     def sync_deleted_tasks(self):
         # Detect Trello cards deleted since last mapping and delete their leads
+        self._sync_deleted_tasks(self.work_client.get_all_cards())
+
+    def _sync_deleted_tasks(self, existing_cards):
+        # Returns the ids of leads deleted from the sheet
         logger.info("Checking for deleted tasks...")
-        known_ids = set(self.mapping["card_to_lead"].keys())
-        existing_cards = self.work_client.get_all_cards()
+        card_to_lead = self.mapping["card_to_lead"]
+        known_ids = card_to_lead.keys()
         existing_ids = {card["id"] for card in existing_cards}
         deleted_ids = known_ids - existing_ids
         logger.info(f"Found {len(deleted_ids)} deleted cards")
 
-        for card_id in deleted_ids:
-            lead_id = self.mapping["card_to_lead"].get(card_id)
-            if not lead_id:
-                continue
-            if self.lead_client.delete_lead(lead_id):
+        pairs = [
+            (lead_id, card_id)
+            for card_id in deleted_ids
+            if (lead_id := card_to_lead.get(card_id)) is not None
+        ]
+        if not pairs:
+            return set()
+
+        # Row deletions shift indices, so they go out as one batched sheet update
+        deleted = self.lead_client.delete_leads([lead_id for lead_id, _ in pairs])
+        removed = []
+        for lead_id, card_id in pairs:
+            if lead_id in deleted:
                 logger.info(f"Deleted lead {lead_id} because card {card_id} was deleted")
-                self.mapping["card_to_lead"].pop(card_id, None)
-                self.mapping["lead_to_card"].pop(str(lead_id), None)
-
-        if deleted_ids:
-            self._save_mapping()
+                removed.append((lead_id, card_id))
+        self.store.append_many(MappingStore.OP_DEL, removed)
+        return deleted
 
     def sync_deleted_leads(self):
         # Detect leads deleted from sheet and archive their Trello cards
+        self._sync_deleted_leads(self.lead_client.get_all_leads())
+
+    def _sync_deleted_leads(self, current_leads):
         logger.info("Checking for deleted leads...")
-        known_lead_ids = set(self.mapping["lead_to_card"].keys())
-        current_leads = self.lead_client.get_all_leads()
-        existing_lead_ids = {str(lead.get("id")) for lead in current_leads}
+        lead_to_card = self.mapping["lead_to_card"]
+        known_lead_ids = lead_to_card.keys()
+        existing_lead_ids = {lead["id"] for lead in current_leads}
         deleted_lead_ids = known_lead_ids - existing_lead_ids
         logger.info(f"Found {len(deleted_lead_ids)} deleted leads")
 
-        for lead_id in deleted_lead_ids:
-            card_id = self.mapping["lead_to_card"].get(lead_id)
-            if not card_id:
-                continue
-            if self.work_client.archive_card(card_id):
+        pairs = [
+            (lead_id, card_id)
+            for lead_id in deleted_lead_ids
+            if (card_id := lead_to_card.get(lead_id)) is not None
+        ]
+
+        # Archive cards in parallel, then update the mapping from this thread
+        results = list(self.pool.map(self.work_client.archive_card, [c for _, c in pairs]))
+        removed = []
+        for (lead_id, card_id), archived in zip(pairs, results):
+            if archived:
                 logger.info(f"Archived card {card_id} because lead {lead_id} was deleted")
-                self.mapping["lead_to_card"].pop(lead_id, None)
-                self.mapping["card_to_lead"].pop(card_id, None)
+                removed.append((lead_id, card_id))
+        self.store.append_many(MappingStore.OP_DEL, removed)
+
+    def _sync_statuses(self, leads, cards):
+        # Reconcile statuses of mapped pairs, writing only sides that changed since
+        # the last full sync; when both changed, Trello wins
+        logger.info("Running status diff sync...")
+        lead_to_card = self.mapping["lead_to_card"]
+        snapshot = self.mapping["status_snapshot"]
+        cards_by_id = {card["id"]: card for card in cards}
+        repairs = []
+        written = 0
 
-        if deleted_lead_ids:
-            self._save_mapping()
+        for lead in leads:
+            lead_id = lead["id"]
+            card_id = lead_to_card.get(lead_id)
+
+            # Fallback: use trello_card_id from sheet to repair mapping
+            if card_id is None:
+                card_id = lead.get("trello_card_id") or None
+                if card_id is None or card_id not in cards_by_id:
+                    continue
+                repairs.append((lead_id, card_id))
+                logger.info(f"Repaired mapping for lead {lead_id}")
+
+            card = cards_by_id.get(card_id)
+            if card is None:
+                continue
+
+            lead_status = lead.get("status")
+            card_status = card.get("status")
+            try:
+                if lead_status != card_status:
+                    if card_status != snapshot.get(card_id):
+                        # Trello -> Sheets
+                        if not self.lead_client.update_lead(
+                            lead_id, {"status": card_status}, self._lead_rows.get(lead_id)
+                        ):
+                            continue
+                        lead_status = card_status
+                    elif lead_status != snapshot.get(lead_id):
+                        # Sheets -> Trello
+                        if not self.work_client.update_card_status(card_id, lead_status):
+                            continue
+                        card_status = lead_status
+                    else:
+                        continue
+                    written += 1
+            except Exception as e:
+                logger.error(f"Error syncing status for lead {lead_id} / card {card_id}: {e}")
+                continue
+
+            snapshot[lead_id] = lead_status
+            snapshot[card_id] = card_status
+
+        if repairs:
+            self.store.append_many(MappingStore.OP_ADD, repairs)
+        logger.info(f"Completed status diff sync: {written} updates for {len(leads)} leads")
 
     def full_sync(self):
         # Complete bidirectional sync with deletion handling
         logger.info("Starting full bidirectional sync...")
         try:
-            # Create any missing cards
-            self.initial_sync()
-            # Handle deletions both ways
-            self.sync_deleted_tasks()
-            self.sync_deleted_leads()
-            # Trello -> Sheets
-            self.sync_all_tasks_to_leads()
-            # Sheets -> Trello
-            self.sync_all_leads_to_tasks()
+            # Fetch both sides once, in parallel, and share the rows between phases
+            fut_leads = self.pool.submit(self.lead_client.get_all_leads)
+            fut_cards = self.pool.submit(self.work_client.get_all_cards)
+            leads = fut_leads.result()
+            cards = fut_cards.result()
+            self._index_rows(leads)
+
+            # Create any missing cards; refetch cards only if new ones exist,
+            # otherwise they would look deleted to the next phase
+            if self._initial_sync(leads):
+                cards = self.work_client.get_all_cards()
+            # Handle deletions both ways; deleted rows shift the ones below them,
+            # so drop them and re-index before any further sheet writes
+            deleted = self._sync_deleted_tasks(cards)
+            if deleted:
+                leads = [lead for lead in leads if lead["id"] not in deleted]
+                self._index_rows(leads)
+            self._sync_deleted_leads(leads)
+            # Status changes both ways, only for rows that changed
+            self._sync_statuses(leads, cards)
+            # Fold the journal into a compact snapshot once per full sync
+            self._save_mapping()
             logger.info("Full sync completed successfully")
         except Exception as e:
             logger.error(f"Full sync failed: {e}")
             raise
+        finally:
+            self._lead_rows.clear()
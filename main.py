@@ -14,24 +14,38 @@ def validate_env():
         "TRELLO_TOKEN",
         "TRELLO_BOARD_ID",
     ]
-    missing = [v for v in required_env_vars if not os.getenv(v)]
+    env = os.environ
+    missing = [v for v in required_env_vars if not env.get(v)]
     if missing:
         logger.error(f"Missing environment variables: {', '.join(missing)}")
         sys.exit(1)
 
+_MENU = (
+    "\n==============================\n"
+    "WELCOME TO WORKLEAD SYNC TOOL\n"
+    "==============================\n"
+    "Choose an option:\n"
+    "1. Initial sync (Leads -> Cards)\n"
+    "2. Full bidirectional sync\n"
+    "3. Bulk sync: ALL leads -> tasks (Sheets -> Trello)\n"
+    "4. Bulk sync: ALL tasks -> leads (Trello -> Sheets)\n"
+    "5. Sync ONE lead -> task (by lead ID)\n"
+    "6. Sync ONE task -> lead (by lead ID or card ID)\n"
+    "Q. Quit\n"
+    "==============================\n"
+)
+
 def print_menu():
-    print("\n==============================")
-    print("WELCOME TO WORKLEAD SYNC TOOL")
-    print("==============================")
-    print("Choose an option:")
-    print("1. Initial sync (Leads -> Cards)")
-    print("2. Full bidirectional sync")
-    print("3. Bulk sync: ALL leads -> tasks (Sheets -> Trello)")
-    print("4. Bulk sync: ALL tasks -> leads (Trello -> Sheets)")
-    print("5. Sync ONE lead -> task (by lead ID)")
-    print("6. Sync ONE task -> lead (by lead ID or card ID)")
-    print("Q. Quit")
-    print("==============================")
+    sys.stdout.write(_MENU)
+
+def prompt(text):
+    # Single write for the prompt, then read one line; None signals EOF
+    sys.stdout.write(text)
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        return None
+    return line.strip()
 
 def main():
     load_dotenv()
@@ -45,9 +59,9 @@ def main():
 
     while True:
         print_menu()
-        choice = input("Enter your choice: ").strip()
+        choice = prompt("Enter your choice: ")
 
-        if choice.lower() == "q":
+        if choice is None or choice.lower() == "q":
             print("\nTHANK YOU FOR USING WORKLEAD SYNC TOOL.")
             break
 
@@ -69,7 +83,7 @@ def main():
                 sync.sync_all_tasks_to_leads()
 
             elif choice == "5":
-                lead_id = input("Enter lead ID to sync (lead -> task): ").strip()
+                lead_id = prompt("Enter lead ID to sync (lead -> task): ")
                 if not lead_id:
                     print("Lead ID cannot be empty.")
                 else:
@@ -77,9 +91,7 @@ def main():
                     sync.sync_lead_to_task(lead_id)
 
             elif choice == "6":
-                id_input = input(
-                    "Enter lead ID or Trello card ID to sync (task -> lead): "
-                ).strip()
+                id_input = prompt("Enter lead ID or Trello card ID to sync (task -> lead): ")
                 if not id_input:
                     print("ID cannot be empty.")
                 else: